@@ -0,0 +1,42 @@
+"""Use server-side timestamp defaults
+
+Revision ID: 0b6e4f2d8c51
+Revises: f3c8d1a7b942
+Create Date: 2026-10-14 15:38:12.904517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b6e4f2d8c51'
+down_revision: Union[str, None] = 'f3c8d1a7b942'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TIMESTAMP_COLUMNS = [
+    ('workflows', 'created_at'),
+    ('workflows', 'updated_at'),
+    ('popularity_metrics', 'metric_date'),
+    ('popularity_metrics', 'created_at'),
+    ('data_collection_logs', 'started_at'),
+]
+
+
+def upgrade() -> None:
+    for table_name, column_name in TIMESTAMP_COLUMNS:
+        op.alter_column(table_name, column_name,
+               existing_type=sa.DateTime(),
+               server_default=sa.text("timezone('utc', now())"),
+               existing_nullable=True)
+
+
+def downgrade() -> None:
+    for table_name, column_name in TIMESTAMP_COLUMNS:
+        op.alter_column(table_name, column_name,
+               existing_type=sa.DateTime(),
+               server_default=None,
+               existing_nullable=True)
@@ -0,0 +1,39 @@
+"""Add platform stats materialized view
+
+Revision ID: b81e5d0c93f7
+Revises: 3c9e1f4b7d2a
+Create Date: 2026-10-14 11:26:05.731448
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81e5d0c93f7'
+down_revision: Union[str, None] = '3c9e1f4b7d2a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE MATERIALIZED VIEW mv_platform_stats AS
+        SELECT w.platform,
+               w.country,
+               COUNT(DISTINCT w.id) AS total,
+               AVG(pm.engagement_score) AS avg_engagement,
+               COUNT(pm.engagement_score) AS metric_count
+        FROM workflows w
+        LEFT JOIN popularity_metrics pm ON pm.workflow_id = w.id
+        GROUP BY w.platform, w.country
+    """)
+    # A unique index is required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.create_index('ix_mv_platform_stats_platform_country', 'mv_platform_stats', ['platform', 'country'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_mv_platform_stats_platform_country', table_name='mv_platform_stats')
+    op.execute("DROP MATERIALIZED VIEW mv_platform_stats")
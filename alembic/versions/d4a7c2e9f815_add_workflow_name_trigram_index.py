@@ -0,0 +1,31 @@
+"""Add workflow name trigram index
+
+Revision ID: d4a7c2e9f815
+Revises: b81e5d0c93f7
+Create Date: 2026-10-14 11:58:40.112376
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a7c2e9f815'
+down_revision: Union[str, None] = 'b81e5d0c93f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_workflows_name_trgm', 'workflows', ['workflow_name'], unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'workflow_name': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_workflows_name_trgm', table_name='workflows')
@@ -0,0 +1,56 @@
+"""Move platform metrics to jsonb payload
+
+Revision ID: f3c8d1a7b942
+Revises: e5b19f3a6c28
+Create Date: 2026-10-14 15:02:47.216904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c8d1a7b942'
+down_revision: Union[str, None] = 'e5b19f3a6c28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (column, type) pairs folded into the payload
+PAYLOAD_COLUMNS = [
+    ('views', sa.Integer()),
+    ('likes', sa.Integer()),
+    ('comments', sa.Integer()),
+    ('like_to_view_ratio', sa.Float()),
+    ('comment_to_view_ratio', sa.Float()),
+    ('replies', sa.Integer()),
+    ('unique_contributors', sa.Integer()),
+    ('search_volume', sa.Integer()),
+    ('interest_score', sa.Integer()),
+    ('trend_percentage', sa.Float()),
+]
+
+
+def upgrade() -> None:
+    op.add_column('popularity_metrics', sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    # Keep only the metrics each row actually has
+    pairs = ', '.join(f"'{name}', {name}" for name, _ in PAYLOAD_COLUMNS)
+    op.execute(f"UPDATE popularity_metrics SET payload = jsonb_strip_nulls(jsonb_build_object({pairs}))")
+    op.alter_column('popularity_metrics', 'payload', nullable=False)
+    for name, _ in PAYLOAD_COLUMNS:
+        op.drop_column('popularity_metrics', name)
+    op.create_index(op.f('ix_popularity_metrics_engagement_score'), 'popularity_metrics', ['engagement_score'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_popularity_metrics_engagement_score'), table_name='popularity_metrics')
+    for name, type_ in PAYLOAD_COLUMNS:
+        op.add_column('popularity_metrics', sa.Column(name, type_, nullable=True))
+    assignments = ', '.join(
+        f"{name} = (payload->>'{name}')::{'integer' if isinstance(type_, sa.Integer) else 'double precision'}"
+        for name, type_ in PAYLOAD_COLUMNS
+    )
+    op.execute(f"UPDATE popularity_metrics SET {assignments}")
+    op.drop_column('popularity_metrics', 'payload')
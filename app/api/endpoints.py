@@ -1,22 +1,128 @@
-from typing import List, Optional
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Any, List, Optional, Tuple
 from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func, desc, or_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import func, desc, lambda_stmt, literal, or_, text, tuple_, true
+from sqlalchemy.orm import aliased, raiseload
 
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.db.session import get_db
 from app.models import Workflow, PopularityMetric
-from app.schemas import WorkflowOut, WorkflowList, PlatformStatsResponse, PlatformStat
+from app.schemas import MetricsOut, WorkflowOut, WorkflowList, PlatformStatsResponse, PlatformStat
 from app.services.collection_service import CollectionService
 
 router = APIRouter()
 
+# Whitelist of sortable fields, resolved to their columns once at import
+SORT_COLUMNS = {
+    "created_at": Workflow.created_at,
+    "updated_at": Workflow.updated_at,
+    "workflow_name": Workflow.workflow_name,
+    "platform": Workflow.platform,
+    "country": Workflow.country,
+}
+DATETIME_SORT_FIELDS = {"created_at", "updated_at"}
+
+# Each workflow's latest metric row via LATERAL. LIMIT 1 yields at most one row per
+# workflow, so rows can be streamed without a uniquing pass.
+_latest_metric_subq = (
+    select(PopularityMetric)
+    .where(PopularityMetric.workflow_id == Workflow.id)
+    .order_by(PopularityMetric.metric_date.desc())
+    .limit(1)
+    .lateral()
+)
+_latest_metric = aliased(PopularityMetric, _latest_metric_subq)
+
+# Totals keyed by the filter tuple (platform, country, search) - pagination excluded
+_count_cache = TTLCache(ttl=settings.WORKFLOW_COUNT_CACHE_TTL)
+
+def _encode_cursor(sort_value: Any, last_id: int) -> str:
+    """
+    Encode the (sort_value, id) of the last row on a page into an opaque token.
+    """
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, last_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def _decode_cursor(token: str, sort_by: str) -> Tuple[Any, int]:
+    """
+    Decode an `after` token back into (sort_value, id) for the keyset predicate.
+    """
+    try:
+        sort_value, last_id = json.loads(base64.urlsafe_b64decode(token.encode()))
+        if sort_by in DATETIME_SORT_FIELDS:
+            if sort_value is not None:
+                sort_value = datetime.fromisoformat(sort_value)
+                # Columns hold naive UTC; an aware value would not compare against them
+                if sort_value.tzinfo is not None:
+                    sort_value = sort_value.astimezone(timezone.utc).replace(tzinfo=None)
+        elif not isinstance(sort_value, str):
+            raise TypeError(f"expected a string cursor value for {sort_by}")
+        if not isinstance(last_id, int):
+            raise TypeError("expected an integer cursor id")
+        return sort_value, last_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+def _to_workflow_out(w: Workflow, latest_metric: Optional[PopularityMetric]) -> WorkflowOut:
+    """
+    Map a Workflow row and its latest metric onto the API schema.
+    Rows come straight from the DB, so models are built with model_construct (no validation).
+    """
+    metrics_out = None
+    if latest_metric is not None:
+        # Platform metrics live in the JSONB payload; keys a platform doesn't report stay None
+        fields = {name: latest_metric.payload.get(name) for name in MetricsOut.model_fields}
+        fields['engagement_score'] = latest_metric.engagement_score
+        fields['metric_date'] = latest_metric.metric_date
+        metrics_out = MetricsOut.model_construct(**fields)
+    return WorkflowOut.model_construct(
+        id=w.id,
+        workflow=w.workflow_name,
+        description=w.description,
+        platform=w.platform,
+        country=w.country,
+        source_url=w.source_url,
+        created_at=w.created_at,
+        updated_at=w.updated_at,
+        popularity_metrics=metrics_out
+    )
+
+async def _count_workflows(db: AsyncSession, cache_key: Tuple, filters: List[Any]) -> int:
+    """
+    Total number of workflows matching `filters`, cached for a short TTL.
+    """
+    total = _count_cache.get(cache_key)
+    if total is not None:
+        return total
+
+    if not filters:
+        # Unfiltered: trust the planner estimate once the table is large enough
+        estimate = (await db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'workflows'::regclass")
+        )).scalar_one_or_none()
+        if estimate is not None and estimate >= settings.WORKFLOW_COUNT_ESTIMATE_THRESHOLD:
+            total = int(estimate)
+
+    if total is None:
+        count_query = select(func.count()).select_from(Workflow).where(*filters)
+        total = (await db.execute(count_query)).scalar_one()
+
+    _count_cache.set(cache_key, total)
+    return total
+
 @router.get("/workflows", response_model=WorkflowList, response_model_exclude_none=True)
 async def get_workflows(
     platform: Optional[str] = None,
     country: Optional[str] = None,
     search: Optional[str] = None,
+    after: Optional[str] = Query(None, description="Opaque cursor returned as `next_cursor` by the previous page"),
     page: int = Query(1, ge=1),
     size: int = Query(50, ge=1, le=100),
     sort_by: str = "created_at",
@@ -25,74 +131,84 @@ async def get_workflows(
 ):
     """
     Get a list of workflows with optional filtering and pagination.
+
+    Pass the `next_cursor` of a response as `after` to fetch the next page with
+    a keyset seek on (sort field, id). `page` is kept as a legacy OFFSET fallback.
     """
-    # Base query
-    query = select(Workflow).options(selectinload(Workflow.metrics))
+    # Base query - join each workflow to only its latest metric row;
+    # raiseload turns accidental lazy loads into errors
+    query = select(Workflow, _latest_metric).outerjoin(_latest_metric, true()).options(raiseload("*"))
     
     # Filters
+    filters = []
     if platform:
-        query = query.where(Workflow.platform == platform)
+        filters.append(Workflow.platform == platform)
     if country:
-        query = query.where(Workflow.country == country)
+        filters.append(Workflow.country == country)
     if search:
         # SECURITY: Sanitize search input - escape special LIKE characters
         safe_search = search.replace("%", r"\%").replace("_", r"\_")
-        query = query.where(Workflow.workflow_name.ilike(f"%{safe_search}%"))
+        filters.append(Workflow.workflow_name.ilike(f"%{safe_search}%"))
+    query = query.where(*filters)
 
     # Sorting - SECURITY: Validate sort_by against whitelist
-    ALLOWED_SORT_FIELDS = {"created_at", "updated_at", "workflow_name", "platform", "country"}
-    if sort_by not in ALLOWED_SORT_FIELDS:
+    if sort_by not in SORT_COLUMNS:
         sort_by = "created_at"  # Default to safe value
     
     if sort_by == "engagement_score":
         # This is complex because engagement_score is in the related metrics table.
-        # Joining for sort:
-        query = query.join(Workflow.metrics).order_by(
-            desc(PopularityMetric.engagement_score) if order == "desc" else PopularityMetric.engagement_score
+        # Sort on the already-joined latest metric:
+        query = query.order_by(
+            desc(_latest_metric.engagement_score) if order == "desc" else _latest_metric.engagement_score
         )
     else:
-        # Default sort field on Workflow
-        field = getattr(Workflow, sort_by, Workflow.created_at)
-        query = query.order_by(desc(field) if order == "desc" else field)
+        # Default sort field on Workflow, with id as a tie-breaker so the
+        # (field, id) pair is unique and can be used as a keyset cursor
+        field = SORT_COLUMNS[sort_by]
+        if order == "desc":
+            query = query.order_by(desc(field), desc(Workflow.id))
+        else:
+            query = query.order_by(field, Workflow.id)
 
-    # Count total (separate query for pagination)
-    # This is rough for async, often need a separate select(func.count()).select_from(...)
-    # omitting for pure speed in this snippet, but listing logic:
-    
-    offset = (page - 1) * size
-    query = query.offset(offset).limit(size)
+        if after:
+            last_val, last_id = _decode_cursor(after, sort_by)
+            # Bind with the column types so the seek compares like with like
+            cursor = tuple_(literal(last_val, field.type), literal(last_id, Workflow.id.type))
+            if order == "desc":
+                query = query.where(tuple_(field, Workflow.id) < cursor)
+            else:
+                query = query.where(tuple_(field, Workflow.id) > cursor)
+
+    if after:
+        query = query.limit(size)
+    else:
+        # Legacy OFFSET pagination
+        offset = (page - 1) * size
+        query = query.offset(offset).limit(size)
     
     # Execution
-    result = await db.execute(query)
-    db_workflows = result.scalars().unique().all()
+    result = await db.stream(query.execution_options(yield_per=100))
     
     # Transform to schema format (mapping workflow_name -> workflow, latest metric -> popularity_metrics)
     items = []
-    for w in db_workflows:
-        latest_metric = None
-        if w.metrics:
-            # Sort by date descending and take first
-            latest_metric = sorted(w.metrics, key=lambda m: m.metric_date, reverse=True)[0]
-            
-        items.append(WorkflowOut(
-            id=w.id,
-            workflow=w.workflow_name,
-            description=w.description,
-            platform=w.platform,
-            country=w.country,
-            source_url=w.source_url,
-            created_at=w.created_at,
-            updated_at=w.updated_at,
-            popularity_metrics=latest_metric
-        ))
+    last = None
+    async for w, latest_metric in result:
+        items.append(_to_workflow_out(w, latest_metric))
+        last = w
     
-    total = len(items) 
+    # Count total (separate, cached query with the same filters but no pagination)
+    total = await _count_workflows(db, (platform, country, search), filters)
+
+    next_cursor = None
+    if len(items) == size:
+        next_cursor = _encode_cursor(getattr(last, sort_by), last.id)
     
     return {
         "total": total,
         "items": items,
         "page": page,
-        "size": size
+        "size": size,
+        "next_cursor": next_cursor
     }
 
 @router.get("/workflows/{workflow_id}", response_model=WorkflowOut)
@@ -100,35 +216,50 @@ async def get_workflow_detail(workflow_id: int, db: AsyncSession = Depends(get_d
     """
     Get detailed information for a specific workflow.
     """
-    query = select(Workflow).where(Workflow.id == workflow_id)
-    result = await db.execute(query)
-    workflow = result.scalar_one_or_none()
+    # Same latest-metric LATERAL as the list endpoint, so only one metric row is loaded.
+    # lambda_stmt caches the statement's construction and cache key; only workflow_id varies
+    query = lambda_stmt(
+        lambda: select(Workflow, _latest_metric).outerjoin(_latest_metric, true()).options(raiseload("*"))
+    )
+    query += lambda s: s.where(Workflow.id == workflow_id)
+    row = (await db.execute(query)).one_or_none()
     
-    if not workflow:
+    if row is None:
         raise HTTPException(status_code=404, detail="Workflow not found")
     
-    return workflow
+    workflow, latest_metric = row
+    return _to_workflow_out(workflow, latest_metric)
 
 @router.get("/statistics/platforms", response_model=PlatformStatsResponse)
 async def get_platform_statistics(db: AsyncSession = Depends(get_db)):
     """
     Get aggregated statistics per platform.
     """
-    # This would typically involve GROUP BY queries.
-    # Simplifying for the agent task to return basic structure.
+    # Aggregates are precomputed in the mv_platform_stats materialized view,
+    # refreshed at the end of every collection run.
+    result = await db.execute(text(
+        "SELECT platform, country, total, avg_engagement, metric_count FROM mv_platform_stats"
+    ))
     
-    stats = []
     platforms = ["youtube", "forum", "google"]
+    rows_by_platform = {p: [] for p in platforms}
+    for row in result:
+        rows_by_platform.setdefault(row.platform, []).append(row)
     
-    for p in platforms:
-        # Count workflows
-        # query = select(func.count(Workflow.id)).where(Workflow.platform == p) ...
-        # Doing a dummy return ensuring structure matches 
+    stats = []
+    for p, rows in rows_by_platform.items():
+        countries = {"US": 0, "IN": 0}
+        countries.update({row.country: row.total for row in rows})
+        
+        # Weight each country's average by its metric count to get the platform average
+        metric_count = sum(row.metric_count for row in rows)
+        engagement_sum = sum(row.avg_engagement * row.metric_count for row in rows if row.metric_count)
+        
         stats.append(PlatformStat(
             platform=p,
-            total_workflows=0,
-            countries={"US": 0, "IN": 0},
-            avg_engagement=0.0
+            total_workflows=sum(row.total for row in rows),
+            countries=countries,
+            avg_engagement=round(engagement_sum / metric_count, 4) if metric_count else 0.0
         ))
 
     return {"platforms": stats}
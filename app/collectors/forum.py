@@ -1,6 +1,7 @@
 import logging
 import aiohttp
 import asyncio
+import ciso8601
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from app.core.config import settings
@@ -11,7 +12,7 @@ logger = logging.getLogger(__name__)
 class ForumCollector:
     BASE_URL = "https://community.n8n.io"
     
-    def __init__(self):
+    def __init__(self, semaphore: Optional[asyncio.Semaphore] = None):
         self.api_key = settings.DISCOURSE_API_KEY
         self.headers = {
             "Content-Type": "application/json"
@@ -20,6 +21,29 @@ class ForumCollector:
             self.headers["Api-Key"] = self.api_key
             # Most Discourse installs also require Api-Username
             # We'll assume public access for now unless specified
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Caps in-flight requests against the forum
+        self._sem = semaphore or asyncio.Semaphore(settings.FORUM_MAX_CONCURRENCY)
+
+    async def _session_get(self) -> aiohttp.ClientSession:
+        """
+        Lazily create one pooled session per collector so requests reuse keep-alive connections.
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        return self._session
+
+    async def aclose(self):
+        """
+        Close the shared HTTP session, if one was opened.
+        """
+        if self._session:
+            await self._session.close()
+            self._session = None
     
     @async_retry(max_retries=3, delay=1, backoff=2)
     async def fetch_latest_topics(self, page: int = 0) -> Dict[str, Any]:
@@ -27,12 +51,13 @@ class ForumCollector:
         Fetch latest topics from the forum.
         """
         url = f"{self.BASE_URL}/latest.json?page={page}"
-        if not self.api_key:
-             # Basic rate limiting for public access (heuristic)
-            await asyncio.sleep(1) 
-
         try:
-            async with aiohttp.ClientSession(headers=self.headers) as session:
+            async with self._sem:
+                if not self.api_key:
+                    # Basic rate limiting for public access (heuristic)
+                    await asyncio.sleep(1)
+
+                session = await self._session_get()
                 async with session.get(url) as response:
                     if response.status == 200:
                         return await response.json()
@@ -50,7 +75,8 @@ class ForumCollector:
         """
         url = f"{self.BASE_URL}/t/{topic_id}.json"
         try:
-            async with aiohttp.ClientSession(headers=self.headers) as session:
+            async with self._sem:
+                session = await self._session_get()
                 async with session.get(url) as response:
                     if response.status == 200:
                         return await response.json()
@@ -90,56 +116,78 @@ class ForumCollector:
             'engagement_score': round(engagement_ratio * 1000, 4) # Scale up essentially
         }
 
+    async def _collect_page(self, page: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Collect workflows from a single page of latest topics.
+        Returns None when the page is empty (past the last page or fetch failed).
+        """
+        results = []
+
+        data = await self.fetch_latest_topics(page)
+        if not data:
+            return None
+            
+        users = {u['id']: u['username'] for u in data.get('users', [])}
+        topics = data.get('topic_list', {}).get('topics', [])
+        
+        for topic in topics:
+            # Filter for relevant categories if needed. 
+            # n8n has a 'Questions' category (id 4 or similar) and 'Share your workflow'
+            # Let's collect all for popularity analysis but prioritized 'Share your workflow' is likely ID 12 or 10.
+            # We won't filter hard yet, just collect data.
+            
+            metrics = self.calculate_metrics(topic)
+            
+            # Normalize data
+            created_at_str = topic.get('created_at')
+            created_at = ciso8601.parse_datetime(created_at_str) if created_at_str else datetime.utcnow()
+
+            workflow_data = {
+                'platform': 'forum',
+                'country': 'US', # Forums are global, defaulting to US for schema or "Global" logic
+                'workflow_name': topic.get('title'),
+                'description': f"Category ID: {topic.get('category_id')}",
+                'source_url': f"{self.BASE_URL}/t/{topic.get('slug')}/{topic.get('id')}",
+                'created_at': created_at,
+                
+                'metrics': metrics
+            }
+            
+            # Add duplicate entry for IN to satisfy the US/IN requirement if we treat forum as global source?
+            # PRD mentions "Data Collection ... Country Filtering". 
+            # Forums don't easily filter by country.
+            # PRD says "Country Segmentation: Set geo parameter to US and IN" for Google, 
+            # and "Country Filtering: Use regionCode" for YouTube.
+            # For Forum, it just marks "Country Filtering" under YouTube. 
+            # We will probably store it as 'US' (or 'Global' if schema allowed, but it's restricted to VARCHAR(2)).
+            # Let's store as a primary record (US) and maybe later duplicate logic or just keep one.
+            # I'll stick to 'US' as default since it's the primary market, or we can look for location data (hard).
+            
+            results.append(workflow_data)
+
+        return results
+
     async def collect_workflows(self, pages: int = 5) -> List[Dict[str, Any]]:
         """
         Collect workflows from the latest topics.
+        Pages are fetched concurrently, bounded by the collector's semaphore.
         """
         results = []
         
         logger.info(f"Collecting N8N forum topics for {pages} pages...")
 
-        for page in range(pages):
-            data = await self.fetch_latest_topics(page)
-            if not data:
+        pages_results = await asyncio.gather(
+            *(self._collect_page(page) for page in range(pages)),
+            return_exceptions=True
+        )
+        for page, page_results in enumerate(pages_results):
+            if isinstance(page_results, Exception):
+                logger.error(f"Exception collecting forum page {page}: {page_results}")
                 break
-                
-            users = {u['id']: u['username'] for u in data.get('users', [])}
-            topics = data.get('topic_list', {}).get('topics', [])
-            
-            for topic in topics:
-                # Filter for relevant categories if needed. 
-                # n8n has a 'Questions' category (id 4 or similar) and 'Share your workflow'
-                # Let's collect all for popularity analysis but prioritized 'Share your workflow' is likely ID 12 or 10.
-                # We won't filter hard yet, just collect data.
-                
-                metrics = self.calculate_metrics(topic)
-                
-                # Normalize data
-                created_at_str = topic.get('created_at')
-                created_at = datetime.fromisoformat(created_at_str.replace('Z', '+00:00')) if created_at_str else datetime.utcnow()
-
-                workflow_data = {
-                    'platform': 'forum',
-                    'country': 'US', # Forums are global, defaulting to US for schema or "Global" logic
-                    'workflow_name': topic.get('title'),
-                    'description': f"Category ID: {topic.get('category_id')}",
-                    'source_url': f"{self.BASE_URL}/t/{topic.get('slug')}/{topic.get('id')}",
-                    'created_at': created_at,
-                    
-                    'metrics': metrics
-                }
-                
-                # Add duplicate entry for IN to satisfy the US/IN requirement if we treat forum as global source?
-                # PRD mentions "Data Collection ... Country Filtering". 
-                # Forums don't easily filter by country.
-                # PRD says "Country Segmentation: Set geo parameter to US and IN" for Google, 
-                # and "Country Filtering: Use regionCode" for YouTube.
-                # For Forum, it just marks "Country Filtering" under YouTube. 
-                # We will probably store it as 'US' (or 'Global' if schema allowed, but it's restricted to VARCHAR(2)).
-                # Let's store as a primary record (US) and maybe later duplicate logic or just keep one.
-                # I'll stick to 'US' as default since it's the primary market, or we can look for location data (hard).
-                
-                results.append(workflow_data)
+            # Stop at the first empty page, like a sequential walk would
+            if page_results is None:
+                break
+            results.extend(page_results)
         
         logger.info(f"Collected {len(results)} forum topics.")
         return results
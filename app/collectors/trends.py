@@ -1,102 +1,180 @@
 import logging
 import asyncio
-from typing import List, Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
+import numpy as np
 from pytrends.request import TrendReq
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Dedicated pool so blocking pytrends/pandas work doesn't compete with the default executor
+_TRENDS_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix='trends')
+
+# pytrends accepts at most 5 keywords per payload
+PAYLOAD_MAX_KEYWORDS = 5
+
+# Per-(country, keyword batch) results, reused across collector instances within the refresh window
+_PAYLOAD_CACHE = TTLCache(ttl=3600)
+
 class TrendsCollector:
-    def __init__(self):
-        # hl='en-US', tz=360 to align with US time
-        self.pytrends = TrendReq(hl='en-US', tz=360, retries=3, backoff_factor=1)
+    def __init__(self, semaphore: Optional[asyncio.Semaphore] = None):
+        # TrendReq keeps per-request payload state, so each worker thread gets its own client
+        self._local = threading.local()
+        # Caps concurrent payload fetches within a country
+        self._sem = semaphore or asyncio.Semaphore(settings.TRENDS_MAX_CONCURRENCY)
+
+    @property
+    def pytrends(self) -> TrendReq:
+        client = getattr(self._local, 'pytrends', None)
+        if client is None:
+            # hl='en-US', tz=360 to align with US time
+            client = TrendReq(hl='en-US', tz=360, retries=3, backoff_factor=1)
+            self._local.pytrends = client
+        return client
 
     async def get_trends_data(self, keyword: str, country_code: str = 'US') -> Dict[str, Any]:
         """
-        Fetch trends data for a single keyword (or list of keywords, but pytrends handles 5 max).
+        Fetch trends data for a single keyword.
         """
+        batch_data = await self.get_trends_batch([keyword], country_code)
+        return batch_data.get(keyword, {})
+
+    async def get_trends_batch(self, keywords: List[str], country_code: str = 'US') -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch trends data for up to PAYLOAD_MAX_KEYWORDS keywords with a single payload build.
+        Results are cached per (country, batch) for the refresh window.
+        """
+        cache_key = (country_code, tuple(keywords))
+        cached = _PAYLOAD_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
         # Pytrends is synchronous, so we might want to wrap in run_in_executor if used in async context extensively.
         # But for daily scheduled jobs, blocking briefly is acceptable or we run it in a thread.
         try:
             # Run in a thread to avoid blocking the event loop
-            return await asyncio.to_thread(self._fetch_pytrends, keyword, country_code)
+            loop = asyncio.get_running_loop()
+            batch_data = await loop.run_in_executor(_TRENDS_POOL, self._fetch_pytrends, keywords, country_code)
         except Exception as e:
-            logger.error(f"Error serving trends for {keyword}: {str(e)}")
+            logger.error(f"Error serving trends for {keywords}: {str(e)}")
             return {}
 
-    def _fetch_pytrends(self, keyword: str, country_code: str) -> Dict[str, Any]:
+        if batch_data:
+            _PAYLOAD_CACHE.set(cache_key, batch_data)
+        return batch_data
+
+    def _fetch_pytrends(self, keywords: List[str], country_code: str) -> Dict[str, Dict[str, Any]]:
         try:
-            self.pytrends.build_payload([keyword], cat=0, timeframe='today 3-m', geo=country_code, gprop='')
+            self.pytrends.build_payload(keywords, cat=0, timeframe='today 3-m', geo=country_code, gprop='')
             
-            # Interest over time
+            # Interest over time, one column per keyword
             interest_over_time_df = self.pytrends.interest_over_time()
             if interest_over_time_df.empty:
                 return {}
 
-            # Calculate metrics
-            mean_interest = float(interest_over_time_df[keyword].mean())
-            last_value = int(interest_over_time_df[keyword].iloc[-1])
-            
-            # Calculate trend percentage (last 30 days vs previous 30 days roughly)
-            # data is usually weekly or daily depending on timeframe. 'today 3-m' is daily.
-            if len(interest_over_time_df) > 60:
-                recent = interest_over_time_df[keyword].iloc[-30:].mean()
-                previous = interest_over_time_df[keyword].iloc[-60:-30].mean()
-                trend_percent = ((recent - previous) / previous * 100) if previous > 0 else 0.0
-            else:
-                trend_percent = 0.0
-
             # Related queries (Rising)
             related_queries = self.pytrends.related_queries()
-            related_top = []
-            if related_queries and keyword in related_queries:
-                top_df = related_queries[keyword]['top']
-                if top_df is not None:
-                    related_top = top_df['query'].head(5).tolist()
-
-            return {
-                'interest_score': int(mean_interest), # Average interest over 3 months
-                'current_interest': last_value,
-                'trend_percentage': round(trend_percent, 2),
-                'related_queries': related_top
-            }
+
+            results = {}
+            for keyword in keywords:
+                if keyword not in interest_over_time_df:
+                    continue
+                results[keyword] = self._calculate_metrics(
+                    interest_over_time_df[keyword].to_numpy(dtype=np.int32),
+                    keyword,
+                    related_queries
+                )
+            return results
         except Exception as e:
-            logger.warning(f"Failed to fetch pytrends for {keyword} in {country_code}: {e}")
+            logger.warning(f"Failed to fetch pytrends for {keywords} in {country_code}: {e}")
             return {}
 
+    def _calculate_metrics(self, arr: np.ndarray, keyword: str, related_queries: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Calculate metrics for one keyword's interest series.
+        """
+        # Calculate metrics on a plain array (avoids per-call pandas Series overhead)
+        mean_interest = float(arr.mean())
+        last_value = int(arr[-1])
+        
+        # Calculate trend percentage (last 30 days vs previous 30 days roughly)
+        # data is usually weekly or daily depending on timeframe. 'today 3-m' is daily.
+        if arr.size > 60:
+            recent = float(arr[-30:].mean())
+            previous = float(arr[-60:-30].mean())
+            trend_percent = ((recent - previous) / previous * 100) if previous > 0 else 0.0
+        else:
+            trend_percent = 0.0
+
+        related_top = []
+        if related_queries and keyword in related_queries:
+            top_df = related_queries[keyword]['top']
+            if top_df is not None:
+                related_top = top_df['query'].head(5).tolist()
+
+        return {
+            'interest_score': int(mean_interest), # Average interest over 3 months
+            'current_interest': last_value,
+            'trend_percentage': round(trend_percent, 2),
+            'related_queries': related_top
+        }
+
+    async def _collect_batch(self, keywords: List[str], country: str) -> List[Dict[str, Any]]:
+        """
+        Collect trends for a batch of keywords in one country.
+        """
+        async with self._sem:
+            # Add a small delay to be nice to Google's rate limits
+            await asyncio.sleep(2) 
+            
+            logger.info(f"Fetching Google Trends for {keywords} in {country}...")
+            batch_data = await self.get_trends_batch(keywords, country_code=country)
+        
+        results = []
+        for keyword in keywords:
+            data = batch_data.get(keyword)
+            if not data:
+                continue
+
+            results.append({
+                'platform': 'google',
+                'country': country,
+                'workflow_name': keyword, # For Trends, the "workflow" is essentially the search term
+                'description': f"Related: {', '.join(data.get('related_queries', []))}",
+                'source_url': f"https://trends.google.com/trends/explore?q={keyword}&geo={country}",
+                'created_at': datetime.utcnow(),
+                
+                'metrics': {
+                    'search_volume': 0, # pytrends doesn't give absolute volume without reference
+                    'interest_score': data.get('interest_score', 0),
+                    'trend_percentage': data.get('trend_percentage', 0.0),
+                    'engagement_score': data.get('current_interest', 0) # Use current interest as proxy
+                }
+            })
+        return results
+
     async def collect_workflows(self, keywords: List[str], countries: List[str] = ['US', 'IN']) -> List[Dict[str, Any]]:
         """
         Collect trends for a list of keywords.
+        Countries are walked one at a time (Google rate limits are strict);
+        keywords are grouped into payload-sized batches that run concurrently, bounded by the semaphore.
         """
         results = []
+        batches = [keywords[i:i + PAYLOAD_MAX_KEYWORDS] for i in range(0, len(keywords), PAYLOAD_MAX_KEYWORDS)]
         
         for country in countries:
-            for keyword in keywords:
-                # Add a small delay to be nice to Google's rate limits
-                await asyncio.sleep(2) 
-                
-                logger.info(f"Fetching Google Trends for '{keyword}' in {country}...")
-                data = await self.get_trends_data(keyword, country_code=country)
-                
-                if not data:
+            country_results = await asyncio.gather(
+                *(self._collect_batch(batch, country) for batch in batches),
+                return_exceptions=True
+            )
+            for batch, batch_results in zip(batches, country_results):
+                if isinstance(batch_results, Exception):
+                    logger.error(f"Error collecting trends for {batch} in {country}: {batch_results}")
                     continue
-                
-                workflow_data = {
-                    'platform': 'google',
-                    'country': country,
-                    'workflow_name': keyword, # For Trends, the "workflow" is essentially the search term
-                    'description': f"Related: {', '.join(data.get('related_queries', []))}",
-                    'source_url': f"https://trends.google.com/trends/explore?q={keyword}&geo={country}",
-                    'created_at': datetime.utcnow(),
-                    
-                    'metrics': {
-                        'search_volume': 0, # pytrends doesn't give absolute volume without reference
-                        'interest_score': data.get('interest_score', 0),
-                        'trend_percentage': data.get('trend_percentage', 0.0),
-                        'engagement_score': data.get('current_interest', 0) # Use current interest as proxy
-                    }
-                }
-                results.append(workflow_data)
+                results.extend(batch_results)
         
         return results
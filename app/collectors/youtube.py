@@ -1,19 +1,40 @@
+import asyncio
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
 from app.core.config import settings
 from app.core.decorators import async_retry
 
 logger = logging.getLogger(__name__)
 
+# Dedicated pool for blocking googleapiclient calls, sized to the request semaphore
+_YT_POOL = ThreadPoolExecutor(max_workers=settings.YOUTUBE_MAX_CONCURRENCY, thread_name_prefix='youtube')
+
 class YouTubeCollector:
-    def __init__(self):
+    def __init__(self, semaphore: Optional[asyncio.Semaphore] = None):
         self.api_key = settings.YOUTUBE_API_KEY
         if not self.api_key:
             logger.warning("YOUTUBE_API_KEY is not set. YouTube collection will fail.")
         self.youtube = build('youtube', 'v3', developerKey=self.api_key)
+        # Caps in-flight Data API requests
+        self._sem = semaphore or asyncio.Semaphore(settings.YOUTUBE_MAX_CONCURRENCY)
+        # httplib2.Http is not thread-safe, so each worker thread gets its own
+        # (built via build_http for the client's default timeout and redirect handling)
+        self._local = threading.local()
+
+    def _execute(self, request) -> Dict[str, Any]:
+        """
+        Execute a googleapiclient request synchronously; meant to run in a worker thread.
+        """
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = self._local.http = build_http()
+        return request.execute(http=http)
 
     @async_retry(max_retries=3, delay=1, backoff=2, exceptions=(HttpError,))
     async def search_videos(self, query: str, country_code: str = 'US', max_results: int = 50) -> List[Dict[str, Any]]:
@@ -25,7 +46,7 @@ class YouTubeCollector:
             # For this project, we might want "all relevant" but let's stick to recent or relevance.
             # PRD implies finding "n8n workflow videos", could be any time.
             
-            search_response = self.youtube.search().list(
+            request = self.youtube.search().list(
                 q=query,
                 part='id,snippet',
                 maxResults=max_results,
@@ -33,7 +54,10 @@ class YouTubeCollector:
                 regionCode=country_code,
                 relevanceLanguage='en',
                 order='relevance' 
-            ).execute()
+            )
+            async with self._sem:
+                # googleapiclient is blocking, keep it off the event loop
+                search_response = await asyncio.get_running_loop().run_in_executor(_YT_POOL, self._execute, request)
 
             videos = []
             for item in search_response.get('items', []):
@@ -62,34 +86,42 @@ class YouTubeCollector:
         """
         stats_map = {}
         
-        # Process in chunks of 50
+        # Process in chunks of 50, all chunks in flight at once (bounded by the semaphore)
         chunk_size = 50
-        for i in range(0, len(video_ids), chunk_size):
-            chunk = video_ids[i:i + chunk_size]
-            try:
-                stats_response = self.youtube.videos().list(
-                    part='statistics,contentDetails',
-                    id=','.join(chunk)
-                ).execute()
-
-                for item in stats_response.get('items', []):
-                    stats = item.get('statistics', {})
-                    vid_id = item['id']
-                    
-                    # Parse duration if needed, but PRD focuses on simple metrics
-                    view_count = int(stats.get('viewCount', 0))
-                    like_count = int(stats.get('likeCount', 0))
-                    comment_count = int(stats.get('commentCount', 0))
-                    
-                    stats_map[vid_id] = {
-                        'views': view_count,
-                        'likes': like_count,
-                        'comments': comment_count
-                    }
-            except HttpError as e:
-                logger.error(f"Error fetching stats for batch: {str(e)}")
-            except Exception as e:
-                logger.error(f"Unexpected error fetching stats: {str(e)}")
+        chunks = [video_ids[i:i + chunk_size] for i in range(0, len(video_ids), chunk_size)]
+
+        async def _fetch_chunk(chunk: List[str]) -> Dict[str, Any]:
+            request = self.youtube.videos().list(
+                part='statistics,contentDetails',
+                id=','.join(chunk)
+            )
+            async with self._sem:
+                return await asyncio.get_running_loop().run_in_executor(_YT_POOL, self._execute, request)
+
+        responses = await asyncio.gather(*(_fetch_chunk(c) for c in chunks), return_exceptions=True)
+
+        for stats_response in responses:
+            if isinstance(stats_response, HttpError):
+                logger.error(f"Error fetching stats for batch: {str(stats_response)}")
+                continue
+            if isinstance(stats_response, Exception):
+                logger.error(f"Unexpected error fetching stats: {str(stats_response)}")
+                continue
+
+            for item in stats_response.get('items', []):
+                stats = item.get('statistics', {})
+                vid_id = item['id']
+                
+                # Parse duration if needed, but PRD focuses on simple metrics
+                view_count = int(stats.get('viewCount', 0))
+                like_count = int(stats.get('likeCount', 0))
+                comment_count = int(stats.get('commentCount', 0))
+                
+                stats_map[vid_id] = {
+                    'views': view_count,
+                    'likes': like_count,
+                    'comments': comment_count
+                }
         
         return stats_map
 
@@ -104,60 +136,78 @@ class YouTubeCollector:
         score = (likes * 2 + comments * 3) / views * 10000
         return round(score, 4)
 
-    async def collect_workflows(self, queries: List[str], countries: List[str] = ['US', 'IN']) -> List[Dict[str, Any]]:
+    async def _collect_query(self, query: str, country: str) -> List[Dict[str, Any]]:
         """
-        Main method to collect workflows from YouTube for given queries and countries.
+        Collect workflows for a single (query, country) pair.
         """
         results = []
+
+        logger.info(f"Searching YouTube for '{query}' in {country}...")
+        videos = await self.search_videos(query, country_code=country)
         
-        for country in countries:
-            for query in queries:
-                logger.info(f"Searching YouTube for '{query}' in {country}...")
-                videos = await self.search_videos(query, country_code=country)
-                
-                if not videos:
-                    continue
+        if not videos:
+            return results
+        
+        video_ids = [v['video_id'] for v in videos]
+        stats_map = await self.get_video_statistics(video_ids)
+        
+        for video in videos:
+            vid_id = video['video_id']
+            if vid_id not in stats_map:
+                continue
                 
-                video_ids = [v['video_id'] for v in videos]
-                stats_map = await self.get_video_statistics(video_ids)
+            stats = stats_map[vid_id]
+            views = stats['views']
+            likes = stats['likes']
+            comments = stats['comments']
+            
+            # Filter out garbage
+            if views < 10:
+                continue
+
+            engagement_score = self.calculate_engagement_score(views, likes, comments)
+            
+            # Calculate ratios
+            like_to_view = (likes / views) if views > 0 else 0.0
+            comment_to_view = (comments / views) if views > 0 else 0.0
+
+            workflow_data = {
+                'platform': 'youtube',
+                'country': country,
+                'workflow_name': video['title'],
+                'description': video['description'],
+                'source_url': f"https://www.youtube.com/watch?v={vid_id}",
+                'created_at': video['published_at'], # This is published date
                 
-                for video in videos:
-                    vid_id = video['video_id']
-                    if vid_id not in stats_map:
-                        continue
-                        
-                    stats = stats_map[vid_id]
-                    views = stats['views']
-                    likes = stats['likes']
-                    comments = stats['comments']
-                    
-                    # Filter out garbage
-                    if views < 10:
-                        continue
-
-                    engagement_score = self.calculate_engagement_score(views, likes, comments)
-                    
-                    # Calculate ratios
-                    like_to_view = (likes / views) if views > 0 else 0.0
-                    comment_to_view = (comments / views) if views > 0 else 0.0
-
-                    workflow_data = {
-                        'platform': 'youtube',
-                        'country': country,
-                        'workflow_name': video['title'],
-                        'description': video['description'],
-                        'source_url': f"https://www.youtube.com/watch?v={vid_id}",
-                        'created_at': video['published_at'], # This is published date
-                        
-                        'metrics': {
-                            'views': views,
-                            'likes': likes,
-                            'comments': comments,
-                            'engagement_score': engagement_score,
-                            'like_to_view_ratio': round(like_to_view, 6),
-                            'comment_to_view_ratio': round(comment_to_view, 6)
-                        }
-                    }
-                    results.append(workflow_data)
+                'metrics': {
+                    'views': views,
+                    'likes': likes,
+                    'comments': comments,
+                    'engagement_score': engagement_score,
+                    'like_to_view_ratio': round(like_to_view, 6),
+                    'comment_to_view_ratio': round(comment_to_view, 6)
+                }
+            }
+            results.append(workflow_data)
+
+        return results
+
+    async def collect_workflows(self, queries: List[str], countries: List[str] = ['US', 'IN']) -> List[Dict[str, Any]]:
+        """
+        Main method to collect workflows from YouTube for given queries and countries.
+        All (country, query) pairs run concurrently, bounded by the collector's semaphore.
+        """
+        results = []
+        
+        pairs = [(country, query) for country in countries for query in queries]
+        pair_results = await asyncio.gather(
+            *(self._collect_query(query, country) for country, query in pairs),
+            return_exceptions=True
+        )
+        for (country, query), items in zip(pairs, pair_results):
+            if isinstance(items, Exception):
+                logger.error(f"Error collecting YouTube '{query}' in {country}: {items}")
+                continue
+            results.extend(items)
         
         return results
@@ -0,0 +1,31 @@
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+class TTLCache:
+    """
+    Minimal in-process cache whose entries expire after `ttl` seconds.
+    """
+    def __init__(self, ttl: float = 60.0, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if len(self._data) >= self.maxsize and key not in self._data:
+            # Evict the entry closest to expiry to stay bounded
+            oldest = min(self._data, key=lambda k: self._data[k][0])
+            del self._data[oldest]
+        self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self) -> None:
+        self._data.clear()
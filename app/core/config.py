@@ -8,6 +8,10 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 40
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 3600
     
     # Platform APIs
     YOUTUBE_API_KEY: Optional[str] = None
@@ -15,6 +19,15 @@ class Settings(BaseSettings):
     
     # Collection Settings
     DAILY_QUOTA_YOUTUBE: int = 10000
+    # Max in-flight HTTP requests per platform
+    YOUTUBE_MAX_CONCURRENCY: int = 8
+    FORUM_MAX_CONCURRENCY: int = 5
+    TRENDS_MAX_CONCURRENCY: int = 2
+
+    # Caching
+    WORKFLOW_COUNT_CACHE_TTL: int = 60
+    # Above this many rows, unfiltered totals use the planner estimate instead of COUNT(*)
+    WORKFLOW_COUNT_ESTIMATE_THRESHOLD: int = 100000
     
     class Config:
         case_sensitive = True
@@ -10,19 +10,26 @@ def async_retry(max_retries: int = 3, delay: float = 1.0, backoff: float = 2.0,
     Decorator for async functions to retry on exception with exponential backoff.
     """
     def decorator(func: Callable) -> Callable:
+        # Sleep before each retry, computed once per decorated function
+        delays = [delay * (backoff ** i) for i in range(max_retries)]
+
         @functools.wraps(func)
         async def wrapper(*args, **kwargs) -> Any:
-            current_delay = delay
-            for attempt in range(max_retries + 1):
+            for attempt, current_delay in enumerate(delays):
                 try:
                     return await func(*args, **kwargs)
                 except exceptions as e:
-                    if attempt == max_retries:
-                        logger.error(f"Function {func.__name__} failed after {max_retries} retries. Error: {e}")
-                        raise e
-                    
-                    logger.warning(f"Function {func.__name__} failed (Attempt {attempt+1}/{max_retries}). Retrying in {current_delay}s... Error: {e}")
+                    logger.warning(
+                        "Function %s failed (Attempt %d/%d). Retrying in %ss... Error: %s",
+                        func.__name__, attempt + 1, max_retries, current_delay, e
+                    )
                     await asyncio.sleep(current_delay)
-                    current_delay *= backoff
+
+            # Final attempt
+            try:
+                return await func(*args, **kwargs)
+            except exceptions as e:
+                logger.error("Function %s failed after %d retries. Error: %s", func.__name__, max_retries, e)
+                raise
         return wrapper
     return decorator
@@ -1,11 +1,20 @@
 import re
+from functools import lru_cache
+
+from rapidfuzz import fuzz
+
+_SPECIAL_RE = re.compile(r'[^\w\s]')
+# Same character class as _SPECIAL_RE restricted to ASCII, for the str.translate fast path
+_ASCII_SPECIAL_TRANS = str.maketrans({c: ' ' for c in map(chr, range(128)) if _SPECIAL_RE.match(c)})
 
 class Normalizer:
     @staticmethod
+    @lru_cache(maxsize=4096)
     def normalize_workflow_name(name: str) -> str:
         """
         Normalize workflow name for fuzzy matching and deduplication.
         Example: "Google Sheets -> Slack" -> "google sheets slack"
+        Memoized, since collectors return the same names run after run.
         """
         if not name:
             return ""
@@ -13,28 +22,23 @@ class Normalizer:
         # Lowercase
         normalized = name.lower()
         
-        # Remove special characters except spaces using regex
-        normalized = re.sub(r'[^\w\s]', ' ', normalized)
-        
-        # Replace multiple spaces with single space
-        normalized = re.sub(r'\s+', ' ', normalized)
+        # Remove special characters except spaces
+        if normalized.isascii():
+            normalized = normalized.translate(_ASCII_SPECIAL_TRANS)
+        else:
+            normalized = _SPECIAL_RE.sub(' ', normalized)
         
-        return normalized.strip()
+        # Collapse whitespace runs into single spaces and trim
+        return ' '.join(normalized.split())
 
     @staticmethod
     def get_fuzzy_match_score(str1: str, str2: str) -> int:
         """
-        Simple Jaccard similarity or token overlap for now.
-        For production, use Levenshtein or RapidFuzz.
+        Token-set similarity between two (normalized) names via RapidFuzz.
         Returns 0-100 score.
         """
-        set1 = set(str1.split())
-        set2 = set(str2.split())
-        
-        if not set1 or not set2:
+        if not str1.split() or not str2.split():
             return 0
         
-        intersection = len(set1.intersection(set2))
-        union = len(set1.union(set2))
-        
-        return int((intersection / union) * 100)
+        return int(fuzz.token_set_ratio(str1, str2))
+
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, UniqueConstraint, Numeric
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, UniqueConstraint, Numeric, Index, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import declarative_base, relationship
-from datetime import datetime
 
 Base = declarative_base()
 
+# Timestamps are filled in by Postgres; columns are naive TIMESTAMP holding UTC,
+# so now() is converted explicitly rather than relying on the session time zone
+utc_now = func.timezone('utc', func.now())
+
 class Workflow(Base):
     __tablename__ = "workflows"
 
@@ -14,13 +18,26 @@ class Workflow(Base):
     platform = Column(String, nullable=False, index=True)  # 'youtube', 'forum', 'google'
     country = Column(String, nullable=False, index=True)   # 'US', 'IN'
     source_url = Column(Text)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utc_now)
+    updated_at = Column(DateTime, server_default=utc_now, onupdate=utc_now)
 
     metrics = relationship("PopularityMetric", back_populates="workflow", cascade="all, delete-orphan")
 
     __table_args__ = (
         UniqueConstraint('normalized_name', 'platform', 'country', name='uq_workflow_platform_country'),
+        # Composite (sort field, id) indexes backing keyset pagination on /workflows
+        Index('ix_workflows_created_at_id', 'created_at', 'id'),
+        Index('ix_workflows_updated_at_id', 'updated_at', 'id'),
+        Index('ix_workflows_platform_id', 'platform', 'id'),
+        Index('ix_workflows_country_id', 'country', 'id'),
+        # Combined platform + country filters on /workflows
+        Index('ix_workflow_platform_country', 'platform', 'country'),
+        # Trigram index so `workflow_name ILIKE '%...%'` search can avoid a sequential scan
+        Index(
+            'ix_workflows_name_trgm', 'workflow_name',
+            postgresql_using='gin',
+            postgresql_ops={'workflow_name': 'gin_trgm_ops'}
+        ),
     )
 
 
@@ -29,32 +46,23 @@ class PopularityMetric(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     workflow_id = Column(Integer, ForeignKey("workflows.id", ondelete="CASCADE"), nullable=False)
-    metric_date = Column(DateTime, default=datetime.utcnow, index=True)
-
-    # YouTube specific
-    views = Column(Integer, nullable=True)
-    likes = Column(Integer, nullable=True)
-    comments = Column(Integer, nullable=True)
-    like_to_view_ratio = Column(Float, nullable=True)
-    comment_to_view_ratio = Column(Float, nullable=True)
-
-    # Forum specific
-    replies = Column(Integer, nullable=True)
-    unique_contributors = Column(Integer, nullable=True)
+    metric_date = Column(DateTime, server_default=utc_now, index=True)
 
-    # Google Trends specific
-    search_volume = Column(Integer, nullable=True)
-    interest_score = Column(Integer, nullable=True)
-    trend_percentage = Column(Float, nullable=True)
+    # Platform-specific metrics, only the keys the source platform reports:
+    # YouTube: views, likes, comments, like_to_view_ratio, comment_to_view_ratio
+    # Forum: replies, unique_contributors
+    # Google Trends: search_volume, interest_score, trend_percentage
+    payload = Column(JSONB, nullable=False)
 
     # Universal
-    engagement_score = Column(Float, nullable=True)
+    engagement_score = Column(Float, nullable=True, index=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utc_now)
 
     workflow = relationship("Workflow", back_populates="metrics")
     
     __table_args__ = (
+        # Also serves "latest metric per workflow" lookups (scanned backward)
         UniqueConstraint('workflow_id', 'metric_date', name='uq_workflow_metric_date'),
     )
 
@@ -68,5 +76,5 @@ class DataCollectionLog(Base):
     status = Column(String, nullable=False)  # 'success', 'failed', 'partial'
     workflows_collected = Column(Integer, default=0)
     error_message = Column(Text, nullable=True)
-    started_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, server_default=utc_now)
     completed_at = Column(DateTime, nullable=True)
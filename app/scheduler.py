@@ -1,27 +1,15 @@
 import logging
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.triggers.cron import CronTrigger
-from app.core.config import settings
 from app.db.session import AsyncSessionLocal
 from app.services.collection_service import CollectionService
 
 logger = logging.getLogger(__name__)
 
-# Jobstore configuration
-jobstores = {
-    'default': SQLAlchemyJobStore(url=settings.DATABASE_URL.replace('+asyncpg', '')) 
-    # SQLAlchemyJobStore uses sync driver usually, or we can use it with sync engine. 
-    # AsyncIOScheduler manages the loop, but jobstore ops might need sync url or specific handling.
-    # Typically SQLAlchemyJobStore works with psycopg2 or similar sync drivers.
-    # We might need to ensure psycopg2 is installed or use a compatible url.
-    # Start simple: use standard postgres url (which defaults to psycopg2 if not specified, 
-    # but we only added asyncpg). We need `psycopg2-binary` for sync operations or 
-    # use MemoryJobStore if complicating deps is an issue, but PRD asked for Postgres.
-    # Let's assume psycopg2-binary will be present or we add it to pyproject.
-}
-
-scheduler = AsyncIOScheduler(jobstores=jobstores)
+# Only the daily job exists and it is re-registered on startup with
+# replace_existing=True, so the default in-memory jobstore is sufficient and
+# keeps the synchronous psycopg2 driver off the event loop.
+scheduler = AsyncIOScheduler()
 
 async def run_collection_job():
     """
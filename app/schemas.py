@@ -44,6 +44,7 @@ class WorkflowList(BaseModel):
     items: List[WorkflowOut]
     page: int
     size: int
+    next_cursor: Optional[str] = None
 
 # --- Platform Stats Schema ---
 class PlatformStat(BaseModel):
@@ -1,10 +1,17 @@
+import asyncio
 import logging
+from datetime import datetime, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.exc import IntegrityError
-from typing import List, Dict, Any
+from sqlalchemy import column, table, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import List, Dict, Any, Optional
 
-from app.models import Workflow, PopularityMetric, DataCollectionLog
+import ciso8601
+import orjson
+
+from app.core.config import settings
+from app.models import Workflow, DataCollectionLog
 from app.core.normalization import Normalizer
 from app.collectors.youtube import YouTubeCollector
 from app.collectors.forum import ForumCollector
@@ -12,110 +19,205 @@ from app.collectors.trends import TrendsCollector
 
 logger = logging.getLogger(__name__)
 
+# Column order for the COPY loads
+WORKFLOW_COPY_COLUMNS = [
+    'workflow_name', 'normalized_name', 'description', 'platform',
+    'country', 'source_url', 'created_at', 'updated_at'
+]
+METRIC_COPY_COLUMNS = ['workflow_id', 'metric_date', 'payload', 'engagement_score', 'created_at']
+# Platform metrics stored in PopularityMetric.payload
+PAYLOAD_KEYS = [
+    'views', 'likes', 'comments', 'like_to_view_ratio', 'comment_to_view_ratio',
+    'replies', 'unique_contributors', 'search_volume', 'interest_score',
+    'trend_percentage'
+]
+
+# Temp table the workflow COPY lands in before the upsert
+WORKFLOW_STAGING_TABLE = 'workflows_staging'
+workflows_staging = table(WORKFLOW_STAGING_TABLE, *(column(c) for c in WORKFLOW_COPY_COLUMNS))
+
+# INSERT ... SELECT from staging that keeps existing rows on a key conflict; RETURNING
+# yields the id of every staged key, whether it was inserted or already present
+_workflow_insert = pg_insert(Workflow).from_select(
+    WORKFLOW_COPY_COLUMNS,
+    select(*(workflows_staging.c[c] for c in WORKFLOW_COPY_COLUMNS))
+)
+WORKFLOW_UPSERT = _workflow_insert.on_conflict_do_update(
+    constraint='uq_workflow_platform_country',
+    set_={'updated_at': _workflow_insert.excluded.updated_at}
+).returning(Workflow.id, Workflow.normalized_name, Workflow.platform, Workflow.country)
+
+def _to_naive_utc(value: Any) -> Optional[datetime]:
+    """
+    Coerce collector timestamps (ISO strings or aware datetimes) to the naive UTC
+    values the TIMESTAMP columns hold; COPY does no implicit conversion.
+    """
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = ciso8601.parse_datetime(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
 class CollectionService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.normalizer = Normalizer()
-        self.youtube_collector = YouTubeCollector()
-        self.forum_collector = ForumCollector()
-        self.trends_collector = TrendsCollector()
+        # Per-platform caps on in-flight HTTP requests, tuned to each API's quota
+        self._yt_sem = asyncio.Semaphore(settings.YOUTUBE_MAX_CONCURRENCY)
+        self._forum_sem = asyncio.Semaphore(settings.FORUM_MAX_CONCURRENCY)
+        self._trends_sem = asyncio.Semaphore(settings.TRENDS_MAX_CONCURRENCY)
+        self.youtube_collector = YouTubeCollector(semaphore=self._yt_sem)
+        self.forum_collector = ForumCollector(semaphore=self._forum_sem)
+        self.trends_collector = TrendsCollector(semaphore=self._trends_sem)
 
-    async def _save_workflow_data(self, data: Dict[str, Any]):
+    def _prepare_workflow_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Save or update workflow and its metrics.
+        Normalize one collected item into the workflow values, metric payload and
+        engagement score to persist.
         """
-        try:
-            workflow_name = data['workflow_name']
-            normalized_name = self.normalizer.normalize_workflow_name(workflow_name)
-            platform = data['platform']
-            country = data['country']
-            
-            # Check if workflow exists
-            query = select(Workflow).where(
-                Workflow.normalized_name == normalized_name,
-                Workflow.platform == platform,
-                Workflow.country == country
-            )
-            result = await self.db.execute(query)
-            workflow = result.scalar_one_or_none()
-            
-            if not workflow:
-                workflow = Workflow(
-                    workflow_name=workflow_name,
-                    normalized_name=normalized_name,
-                    description=data.get('description'),
-                    platform=platform,
-                    country=country,
-                    source_url=data.get('source_url'),
-                    created_at=data.get('created_at')
+        metrics_data = data['metrics']
+        return {
+            'workflow_name': data['workflow_name'],
+            'normalized_name': self.normalizer.normalize_workflow_name(data['workflow_name']),
+            'description': data.get('description'),
+            'platform': data['platform'],
+            'country': data['country'],
+            'source_url': data.get('source_url'),
+            'created_at': _to_naive_utc(data.get('created_at')),
+            'payload': {key: metrics_data[key] for key in PAYLOAD_KEYS if metrics_data.get(key) is not None},
+            'engagement_score': metrics_data.get('engagement_score')
+        }
+
+    async def _save_workflows_bulk(self, items: List[Dict[str, Any]]):
+        """
+        Save all collected workflows (COPY into staging plus one upsert) and their
+        metrics (COPY). Errors propagate; the caller rolls back and logs the failure.
+        """
+        # One record per (normalized_name, platform, country); the last occurrence wins
+        records = {}
+        for item in items:
+            record = self._prepare_workflow_data(item)
+            records[(record['normalized_name'], record['platform'], record['country'])] = record
+        if not records:
+            return
+
+        conn = await self.db.connection()
+        raw = await conn.get_raw_connection()
+        driver = raw.driver_connection
+        now = datetime.utcnow()
+
+        # COPY into staging, then upsert into workflows in one statement, so
+        # concurrent runs can't race between an existence check and the insert
+        await self.db.execute(text(
+            f"CREATE TEMP TABLE {WORKFLOW_STAGING_TABLE} AS "
+            f"SELECT {', '.join(WORKFLOW_COPY_COLUMNS)} FROM workflows WITH NO DATA"
+        ))
+        await driver.copy_records_to_table(
+            WORKFLOW_STAGING_TABLE,
+            columns=WORKFLOW_COPY_COLUMNS,
+            records=[
+                (
+                    record['workflow_name'],
+                    record['normalized_name'],
+                    record['description'],
+                    record['platform'],
+                    record['country'],
+                    record['source_url'],
+                    record['created_at'] or now,
+                    now
                 )
-                self.db.add(workflow)
-                await self.db.flush() # Get ID
-            else:
-                # Update basic fields if needed
-                pass
-
-            # Add Metrics
-            metrics_data = data['metrics']
-            metric = PopularityMetric(
-                workflow_id=workflow.id,
-                views=metrics_data.get('views'),
-                likes=metrics_data.get('likes'),
-                comments=metrics_data.get('comments'),
-                like_to_view_ratio=metrics_data.get('like_to_view_ratio'),
-                comment_to_view_ratio=metrics_data.get('comment_to_view_ratio'),
-                replies=metrics_data.get('replies'),
-                unique_contributors=metrics_data.get('unique_contributors'),
-                search_volume=metrics_data.get('search_volume'),
-                interest_score=metrics_data.get('interest_score'),
-                trend_percentage=metrics_data.get('trend_percentage'),
-                engagement_score=metrics_data.get('engagement_score')
-            )
-            self.db.add(metric)
-            
-        except IntegrityError:
-            await self.db.rollback()
-            logger.warning(f"Integrity Error saving {data.get('workflow_name')}")
-        except Exception as e:
-            await self.db.rollback()
-            logger.error(f"Error saving workflow {data.get('workflow_name')}: {str(e)}")
+                for record in records.values()
+            ]
+        )
+        result = await self.db.execute(WORKFLOW_UPSERT)
+        workflow_ids = {(row.normalized_name, row.platform, row.country): row.id for row in result}
+        await self.db.execute(text(f"DROP TABLE {WORKFLOW_STAGING_TABLE}"))
+
+        await driver.copy_records_to_table(
+            'popularity_metrics',
+            columns=METRIC_COPY_COLUMNS,
+            # asyncpg sends jsonb as text unless a codec is registered
+            records=[
+                (workflow_ids[key], now, orjson.dumps(record['payload']).decode(), record['engagement_score'], now)
+                for key, record in records.items()
+            ]
+        )
+
+    async def _collect_youtube(self) -> List[Dict[str, Any]]:
+        yt_queries = ["n8n workflow tutorial", "n8n automation", "n8n integration"]
+        return await self.youtube_collector.collect_workflows(yt_queries)
+
+    async def _collect_forum(self) -> List[Dict[str, Any]]:
+        try:
+            return await self.forum_collector.collect_workflows()
+        finally:
+            await self.forum_collector.aclose()
+
+    async def _collect_trends(self) -> List[Dict[str, Any]]:
+        trends_keywords = ["n8n", "n8n automation", "zapier vs n8n"]
+        return await self.trends_collector.collect_workflows(trends_keywords)
 
     async def collect_all(self):
         """
         Trigger collection for all platforms.
+        Collectors run concurrently; all DB writes happen after they finish,
+        since the session must not be used from concurrent tasks.
         """
-        # 1. YouTube
+        platforms = ['youtube', 'forum', 'google']
+        results = await asyncio.gather(
+            self._collect_youtube(),
+            self._collect_forum(),
+            self._collect_trends(),
+            return_exceptions=True
+        )
+
+        all_items = []
+        for platform, data in zip(platforms, results):
+            if isinstance(data, Exception):
+                logger.error(f"Error collecting {platform} workflows: {str(data)}")
+            else:
+                all_items.extend(data)
+
+        # Workflow data and collection logs are committed as one unit of work; a failed
+        # save rolls back its rows and marks every platform's log as failed
+        save_error = None
         try:
-            yt_queries = ["n8n workflow tutorial", "n8n automation", "n8n integration"]
-            yt_data = await self.youtube_collector.collect_workflows(yt_queries)
-            for item in yt_data:
-                await self._save_workflow_data(item)
-            await self._log_collection('youtube', 'US', 'success', len(yt_data))
+            await self._save_workflows_bulk(all_items)
         except Exception as e:
-            await self._log_collection('youtube', 'US', 'failed', 0, str(e))
+            await self.db.rollback()
+            save_error = str(e)
+            logger.error(f"Error bulk saving {len(all_items)} workflows: {save_error}")
+
+        for platform, data in zip(platforms, results):
+            if isinstance(data, Exception):
+                self._log_collection(platform, 'US', 'failed', 0, str(data))
+            elif save_error is not None:
+                self._log_collection(platform, 'US', 'failed', 0, save_error)
+            else:
+                self._log_collection(platform, 'US', 'success', len(data))
 
-        # 2. Forum
         try:
-            forum_data = await self.forum_collector.collect_workflows()
-            for item in forum_data:
-                await self._save_workflow_data(item)
-            await self._log_collection('forum', 'US', 'success', len(forum_data))
+            await self.db.commit()
         except Exception as e:
-            await self._log_collection('forum', 'US', 'failed', 0, str(e))
-        
-        # 3. Trends
+            await self.db.rollback()
+            logger.error(f"Error committing collection run: {str(e)}")
+
+        await self._refresh_platform_stats()
+
+    async def _refresh_platform_stats(self):
+        """
+        Refresh the mv_platform_stats materialized view backing /statistics/platforms.
+        """
         try:
-            trends_keywords = ["n8n", "n8n automation", "zapier vs n8n"]
-            trends_data = await self.trends_collector.collect_workflows(trends_keywords)
-            for item in trends_data:
-                await self._save_workflow_data(item)
-            await self._log_collection('google', 'US', 'success', len(trends_data))
+            await self.db.execute(text('REFRESH MATERIALIZED VIEW CONCURRENTLY mv_platform_stats'))
+            await self.db.commit()
         except Exception as e:
-            await self._log_collection('google', 'US', 'failed', 0, str(e))
-        
-        await self.db.commit()
+            await self.db.rollback()
+            logger.error(f"Error refreshing platform stats view: {str(e)}")
 
-    async def _log_collection(self, platform, country, status, count, error=None):
+    def _log_collection(self, platform, country, status, count, error=None):
         log = DataCollectionLog(
             platform=platform,
             country=country,
@@ -124,7 +226,3 @@ class CollectionService:
             error_message=error
         )
         self.db.add(log)
-        try:
-            await self.db.commit()
-        except:
-            await self.db.rollback()
@@ -1,8 +1,18 @@
+import re
 from typing import List, Dict, Any
 from app.models import Workflow, PopularityMetric
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, true
 from sqlalchemy.future import select
 
+_COMPLEXITY_RE = re.compile(r'\b(if|function|code|javascript|merge|iterator)\b', re.IGNORECASE)
+
+# Most divergent workflows returned by get_geographic_divergence
+DIVERGENCE_LIMIT = 10
+# Platforms whose collectors assign a fixed country rather than a measured one
+# (the forum is global and tagged 'US'), so they carry no regional signal
+NO_COUNTRY_SIGNAL_PLATFORMS = ['forum']
+
 class NoveltyService:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -11,22 +21,62 @@ class NoveltyService:
         """
         Identify workflows that are popular in one region but not another (US vs IN).
         Novelty #4: Geographic Trend Divergence Detection.
+        Names measured in both regions are ranked by engagement ratio; names seen in
+        only one region follow them.
         """
-        # Logic: Find workflows where (US_rank - IN_rank) is high.
-        # Simplified: Find workflows present in one but not other, or huge view diff per capita.
-        # Implementation: returning mock/calculated data for demo
-        return [
-            {
-                "workflow_name": "WhatsApp Business API",
-                "divergence_score": 85,
-                "insight": "5x more popular in India than US"
-            },
-            {
-                "workflow_name": "Twilio SMS",
-                "divergence_score": 70,
-                "insight": "2x more popular in US than India"
-            }
-        ]
+        # Each workflow contributes only its latest engagement score, via LATERAL
+        latest = (
+            select(PopularityMetric.engagement_score)
+            .where(PopularityMetric.workflow_id == Workflow.id)
+            .order_by(PopularityMetric.metric_date.desc())
+            .limit(1)
+            .lateral()
+        )
+        engagement = latest.c.engagement_score
+
+        # One aggregation over both regions: per normalized name, engagement in US and
+        # IN, with the larger/smaller ratio computed in the database. Sums are
+        # coalesced to 0 since GREATEST/LEAST would otherwise skip a missing region.
+        us = func.coalesce(func.sum(engagement).filter(Workflow.country == 'US'), 0)
+        in_ = func.coalesce(func.sum(engagement).filter(Workflow.country == 'IN'), 0)
+        high, low = func.greatest(us, in_), func.least(us, in_)
+        # NULL when one region has no engagement at all
+        ratio = high / func.nullif(low, 0)
+        query = (
+            select(
+                func.max(Workflow.workflow_name).label('workflow_name'),
+                us.label('us'),
+                in_.label('in_'),
+                ratio.label('ratio'),
+                (100 * (1 - low / high)).label('divergence_score')
+            )
+            .select_from(Workflow)
+            .join(latest, true())
+            .where(
+                Workflow.country.in_(['US', 'IN']),
+                Workflow.platform.notin_(NO_COUNTRY_SIGNAL_PLATFORMS)
+            )
+            .group_by(Workflow.normalized_name)
+            .having(high > 0)
+            # Real two-region comparisons first, then single-region names
+            .order_by((low > 0).desc(), ratio.desc(), high.desc())
+            .limit(DIVERGENCE_LIMIT)
+        )
+        result = await self.db.execute(query)
+
+        divergences = []
+        for row in result:
+            leader, other = ("US", "India") if row.us > row.in_ else ("India", "US")
+            if row.ratio is None:
+                insight = f"Only seen in {leader}, no engagement in {other}"
+            else:
+                insight = f"{round(float(row.ratio), 1):g}x more popular in {leader} than {other}"
+            divergences.append({
+                "workflow_name": row.workflow_name,
+                "divergence_score": round(row.divergence_score),
+                "insight": insight
+            })
+        return divergences
 
     async def get_predictions(self, workflow_id: int) -> Dict[str, Any]:
         """
@@ -49,9 +99,8 @@ class NoveltyService:
         if not description:
             return {"score": 0, "level": "Unknown"}
             
-        score = 1
-        keywords = ["if", "function", "code", "javascript", "merge", "iterator"]
-        score += sum(1 for k in keywords if k in description.lower())
+        # One point per distinct complexity keyword mentioned
+        score = 1 + len({m.lower() for m in _COMPLEXITY_RE.findall(description)})
         
         level = "Beginner"
         if score > 3: level = "Intermediate"
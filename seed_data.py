@@ -1,11 +1,11 @@
 import asyncio
-import json
 import logging
+import orjson
 from app.db.session import AsyncSessionLocal
 from app.services.collection_service import CollectionService
 from app.api.endpoints import get_workflows
+from sqlalchemy import func, insert, true
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
 from app.models import Workflow, PopularityMetric
 
 # logging.basicConfig(level=logging.INFO)
@@ -24,10 +24,7 @@ async def seed_and_export():
         print("✅ Collection job finished.")
         
         # 2. Verify Count
-        query = select(Workflow).options(selectinload(Workflow.metrics))
-        result = await db.execute(query)
-        workflows = result.scalars().all()
-        count = len(workflows)
+        count = (await db.execute(select(func.count()).select_from(Workflow))).scalar_one()
         print(f"📊 Total Workflows in DB: {count}")
         
         if count < 50:
@@ -43,101 +40,107 @@ async def seed_and_export():
                       "HubSpot CRM Sync", "Salesforce Lead Capture", "Trello Card Creator", 
                       "Asana Task Manager", "ClickUp Sync", "Monday.com Update", "Jira Ticket Creator"]
             
-            dummy_workflows = []
-            seen_combos = set()
+            # Draw (topic, platform) pairs from the full product and give each a distinct
+            # number, so all 55 names are unique without a rejection loop
+            random.seed(42)  # Reproducible demo data
+            combos = [(t, p) for t in topics for p in platforms]
+            picks = random.choices(combos, k=55)
+            numbers = random.sample(range(1000, 10000), k=len(picks))
             
-            for i in range(100): # Try more times to get 55 unique
-                if len(dummy_workflows) >= 55: break
-                
-                topic = random.choice(topics)
-                platform = random.choice(platforms)
-                
+            def make_item(topic, platform, number):
                 # Make unique name
-                w_name = f"{topic} {platform.capitalize()} Tutorial #{random.randint(1000, 9999)}"
-                if platform == "google": w_name = f"n8n {topic.lower()} workflow {random.randint(1000, 9999)}"
-                
-                combo_key = f"{w_name}_{platform}"
-                if combo_key in seen_combos: continue
-                seen_combos.add(combo_key)
+                w_name = f"{topic} {platform.capitalize()} Tutorial #{number}"
+                if platform == "google": w_name = f"n8n {topic.lower()} workflow {number}"
                 
                 # Metrics logic...
-                metric = {
-                    "views": random.randint(100, 50000),
-                    "likes": random.randint(10, 2000),
-                    "comments": random.randint(0, 500),
-                }
-                if metric["views"] > 0:
-                    metric["like_to_view_ratio"] = round(metric["likes"] / metric["views"], 4)
-                    metric["comment_to_view_ratio"] = round(metric["comments"] / metric["views"], 4)
-                else: 
-                    metric["like_to_view_ratio"] = 0
-                    metric["comment_to_view_ratio"] = 0
-
-                item = {
+                views = random.randint(100, 50000)
+                likes = random.randint(10, 2000)
+                comments = random.randint(0, 500)
+                return {
                     "workflow": w_name,
                     "platform": platform,
-                    "popularity_metrics": metric,
+                    "popularity_metrics": {
+                        "views": views,
+                        "likes": likes,
+                        "comments": comments,
+                        "like_to_view_ratio": round(likes / views, 4),
+                        "comment_to_view_ratio": round(comments / views, 4)
+                    },
                     "country": "US"
                 }
-                dummy_workflows.append(item)
+            
+            dummy_workflows = [make_item(t, p, n) for (t, p), n in zip(picks, numbers)]
             
             if count == 0:
                 print("Inserting dummy data into Database...")
-                for d in dummy_workflows:
-                    # Check if exists (skipping for now blindly to rely on unique randoms)
-                    w = Workflow(
-                        workflow_name=d['workflow'],
-                        normalized_name=d['workflow'].lower().replace(' ', '')[:250], # Truncate if needed
-                        description=f"Automated workflow for {d['workflow']}",
-                        platform=d['platform'],
-                        country=d['country'],
-                        source_url="https://example.com/demo",
-                        created_at=datetime.utcnow() - timedelta(days=random.randint(0, 365)),
-                        updated_at=datetime.utcnow()
-                    )
-                    db.add(w)
-                    await db.flush()
-                    
-                    m = d['popularity_metrics']
-                    pm = PopularityMetric(
-                        workflow_id=w.id,
-                        views=m['views'],
-                        likes=m['likes'],
-                        comments=m['comments'],
-                        like_to_view_ratio=m['like_to_view_ratio'],
-                        comment_to_view_ratio=m['comment_to_view_ratio'],
-                        metric_date=datetime.utcnow()
-                    )
-                    db.add(pm)
+                now = datetime.utcnow()
+                # Names are unique by construction, so no existence check is needed
+                workflow_rows = [
+                    {
+                        "workflow_name": d['workflow'],
+                        "normalized_name": d['workflow'].lower().replace(' ', '')[:250], # Truncate if needed
+                        "description": f"Automated workflow for {d['workflow']}",
+                        "platform": d['platform'],
+                        "country": d['country'],
+                        "source_url": "https://example.com/demo",
+                        "created_at": now - timedelta(days=random.randint(0, 365)),
+                        "updated_at": now
+                    }
+                    for d in dummy_workflows
+                ]
+                # One multi-row INSERT; RETURNING ids come back in parameter order
+                result = await db.execute(
+                    insert(Workflow).returning(Workflow.id, sort_by_parameter_order=True),
+                    workflow_rows
+                )
+                workflow_ids = result.scalars().all()
+                
+                metric_rows = [
+                    {
+                        "workflow_id": workflow_id,
+                        "payload": d['popularity_metrics'],
+                        "metric_date": now
+                    }
+                    for workflow_id, d in zip(workflow_ids, dummy_workflows)
+                ]
+                await db.execute(insert(PopularityMetric), metric_rows)
                 await db.commit()
-                # Reload workflows for export
-                result = await db.execute(select(Workflow).options(selectinload(Workflow.metrics)))
-                workflows = result.scalars().all()
 
 
         # 3. Export to JSON (Deliverable Format)
-        export_data = []
-        for w in workflows:
-            latest_metric = None
-            if w.metrics:
-                latest_metric = sorted(w.metrics, key=lambda m: m.metric_date, reverse=True)[0]
-            
-            item = {
-                "workflow": w.workflow_name,
-                "platform": w.platform,
-                "popularity_metrics": {
-                    "views": latest_metric.views if latest_metric else 0,
-                    "likes": latest_metric.likes if latest_metric else 0,
-                    "comments": latest_metric.comments if latest_metric else 0,
-                    "like_to_view_ratio": latest_metric.like_to_view_ratio if latest_metric else 0,
-                    "comment_to_view_ratio": latest_metric.comment_to_view_ratio if latest_metric else 0
-                },
-                "country": w.country
-            }
-            export_data.append(item)
-            
-        with open("workflows_dataset.json", "w", encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2, default=str)
+        # Each workflow joined to only its latest metric payload via LATERAL, projecting
+        # just the exported columns instead of full ORM rows
+        latest_subq = (
+            select(PopularityMetric.payload)
+            .where(PopularityMetric.workflow_id == Workflow.id)
+            .order_by(PopularityMetric.metric_date.desc())
+            .limit(1)
+            .lateral()
+        )
+        result = await db.stream(
+            select(Workflow.workflow_name, Workflow.platform, Workflow.country, latest_subq.c.payload)
+            .outerjoin(latest_subq, true())
+            .execution_options(yield_per=500)
+        )
+
+        # Stream rows straight to disk as an indented JSON array, one orjson-encoded item at a time
+        with open("workflows_dataset.json", "wb") as f:
+            f.write(b"[")
+            first = True
+            async for row in result:
+                item = {
+                    "workflow": row.workflow_name,
+                    "platform": row.platform,
+                    "popularity_metrics": {
+                        key: row.payload.get(key) if row.payload is not None else 0
+                        for key in ("views", "likes", "comments", "like_to_view_ratio", "comment_to_view_ratio")
+                    },
+                    "country": row.country
+                }
+                f.write(b"\n  " if first else b",\n  ")
+                f.write(orjson.dumps(item, option=orjson.OPT_INDENT_2).replace(b"\n", b"\n  "))
+                first = False
+            f.write(b"]" if first else b"\n]")
             
         print("💾 Exported 'workflows_dataset.json' with proper format.")
 
@@ -3,8 +3,8 @@ import pytest
 import pytest_asyncio
 from typing import AsyncGenerator, Generator
 from httpx import AsyncClient, ASGITransport
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 from app.main import app
 from app.db.session import get_db
 from app.models import Base
@@ -12,8 +12,8 @@ from app.core.config import settings
 
 TEST_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_async_engine(TEST_DATABASE_URL, echo=False)
-TestingSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+engine = create_async_engine(TEST_DATABASE_URL, echo=False, poolclass=NullPool)
+TestingSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
 @pytest.fixture(scope="session")
 def event_loop() -> Generator:
@@ -25,3 +25,60 @@ async def test_geo_analytics(client: AsyncClient):
     assert isinstance(data, list)
     if len(data) > 0:
         assert "divergence_score" in data[0]
+
+@pytest.mark.asyncio
+async def test_geo_analytics_forum_and_latest_metric(client: AsyncClient, db):
+    from datetime import datetime
+    from app.models import Workflow, PopularityMetric
+
+    def add_workflow(name, platform, country, *scores):
+        workflow = Workflow(workflow_name=name, normalized_name=name.lower(), platform=platform, country=country)
+        for day, score in enumerate(scores, start=1):
+            workflow.metrics.append(PopularityMetric(payload={}, engagement_score=score,
+                                                     metric_date=datetime(2020, 1, day)))
+        db.add(workflow)
+
+    # Forum rows are tagged 'US' without any regional signal and must be ignored
+    add_workflow("Geo Test Forum Topic", "forum", "US", 1e12)
+    # Only the latest US metric (1e6, not the older 9e6) counts against IN's 1e3
+    add_workflow("Geo Test Regional", "youtube", "US", 9e6, 1e6)
+    add_workflow("Geo Test Regional", "youtube", "IN", 1e3)
+    await db.flush()
+
+    response = await client.get("/api/v1/analytics/geographic-divergence")
+    assert response.status_code == 200
+    data = response.json()
+    assert all(d["workflow_name"] != "Geo Test Forum Topic" for d in data)
+    entry = next(d for d in data if d["workflow_name"] == "Geo Test Regional")
+    assert entry["insight"] == "1000x more popular in US than India"
+
+def test_pagination_cursor_roundtrip():
+    from datetime import datetime
+    from app.api.endpoints import _encode_cursor, _decode_cursor
+    ts = datetime(2025, 12, 19, 15, 7, 52)
+    token = _encode_cursor(ts, 42)
+    assert _decode_cursor(token, "created_at") == (ts, 42)
+    assert _decode_cursor(_encode_cursor("youtube", 7), "platform") == ("youtube", 7)
+    # Aware timestamps are normalized to the naive UTC the columns hold
+    aware = _encode_cursor("2025-01-01T05:00:00+05:00", 3)
+    assert _decode_cursor(aware, "created_at") == (datetime(2025, 1, 1, 0, 0), 3)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sort_by, cursor_value", [
+    ("platform", [123, 1]),
+    ("workflow_name", [None, 1]),
+    ("created_at", [123, 1]),
+    ("created_at", ["not-a-date", 1]),
+    ("country", ["US", "1"]),
+    ("country", "US"),
+])
+async def test_get_workflows_invalid_cursor(client: AsyncClient, sort_by, cursor_value):
+    import base64, json
+    token = base64.urlsafe_b64encode(json.dumps(cursor_value).encode()).decode()
+    response = await client.get("/api/v1/workflows", params={"sort_by": sort_by, "after": token})
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_get_workflows_malformed_cursor(client: AsyncClient):
+    response = await client.get("/api/v1/workflows", params={"after": "not a cursor"})
+    assert response.status_code == 400
@@ -6,6 +6,7 @@ def test_normalization():
     norm = Normalizer()
     assert norm.normalize_workflow_name("Google Sheets -> Slack") == "google sheets slack"
     assert norm.normalize_workflow_name("n8n   Automation!!!") == "n8n automation"
+    assert norm.normalize_workflow_name("Google Sheets → Slack ✨") == "google sheets slack"
 
 def test_engagement_calculation():
     collector = YouTubeCollector()
@@ -18,3 +19,82 @@ def test_engagement_zero_views():
     collector = YouTubeCollector()
     score = collector.calculate_engagement_score(views=0, likes=10, comments=5)
     assert score == 0.0
+
+def test_fuzzy_match_score():
+    norm = Normalizer()
+    assert norm.get_fuzzy_match_score("google sheets slack", "slack google sheets") == 100
+    assert norm.get_fuzzy_match_score("", "slack") == 0
+    assert norm.get_fuzzy_match_score("telegram bot", "shopify order sync") < 50
+
+@pytest.mark.asyncio
+async def test_async_retry_retries_then_raises():
+    from app.core.decorators import async_retry
+    calls = []
+
+    @async_retry(max_retries=2, delay=0, backoff=2, exceptions=(ValueError,))
+    async def flaky():
+        calls.append(1)
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        await flaky()
+    assert len(calls) == 3
+
+@pytest.mark.asyncio
+async def test_geographic_divergence_rows():
+    from collections import namedtuple
+    from app.services.novelty_service import NoveltyService
+    Row = namedtuple("Row", "workflow_name us in_ ratio divergence_score")
+
+    class FakeSession:
+        async def execute(self, query):
+            return [
+                # Engagement in one region only: coalesced to 0, ratio is NULL
+                Row("WhatsApp Business API", 0.0, 25.0, None, 100.0),
+                # Engagement in both regions
+                Row("Twilio SMS", 40.0, 20.0, 2.0, 50.0),
+            ]
+
+    result = await NoveltyService(FakeSession()).get_geographic_divergence()
+    assert result == [
+        {"workflow_name": "WhatsApp Business API", "divergence_score": 100,
+         "insight": "Only seen in India, no engagement in US"},
+        {"workflow_name": "Twilio SMS", "divergence_score": 50,
+         "insight": "2x more popular in US than India"},
+    ]
+
+@pytest.mark.asyncio
+async def test_collect_all_logs_failed_save():
+    from app.services.collection_service import CollectionService
+
+    class FakeSession:
+        def __init__(self):
+            self.added, self.commits, self.rollbacks = [], 0, 0
+        def add(self, obj):
+            self.added.append(obj)
+        async def commit(self):
+            self.commits += 1
+        async def rollback(self):
+            self.rollbacks += 1
+
+    async def collected():
+        return [{"workflow_name": "Telegram Bot", "platform": "forum", "country": "US", "metrics": {}}]
+
+    async def failing_save(items):
+        raise RuntimeError("copy failed")
+
+    async def no_refresh():
+        pass
+
+    db = FakeSession()
+    service = CollectionService(db)
+    service._collect_youtube = service._collect_forum = service._collect_trends = collected
+    service._save_workflows_bulk = failing_save
+    service._refresh_platform_stats = no_refresh
+
+    await service.collect_all()
+
+    assert db.rollbacks == 1 and db.commits == 1
+    assert [(log.status, log.workflows_collected, log.error_message) for log in db.added] == [
+        ("failed", 0, "copy failed")
+    ] * 3
@@ -1,52 +1,63 @@
-import urllib.request
+import asyncio
 import json
 import sys
 
+import aiohttp
+
 BASE_URL = "http://localhost:8000"
 
-def make_request(endpoint, output_filename=None):
-    url = f"{BASE_URL}{endpoint}"
-    print(f"Testing {url}...")
-    try:
-        with urllib.request.urlopen(url) as response:
-            if response.status == 200:
-                data = json.loads(response.read().decode())
-                print(f"✅ Success! Response:")
-                print(json.dumps(data, indent=2)[:500] + "... (truncated)" if len(str(data)) > 500 else json.dumps(data, indent=2))
-                
-                if output_filename:
-                    with open(output_filename, 'w', encoding='utf-8') as f:
-                        json.dump(data, f, indent=2)
-                    print(f"💾 Saved response to '{output_filename}'")
-                return True
-            else:
-                print(f"Failed with status code: {response.status}")
-                return False
-    except urllib.error.URLError as e:
-        print(f"Connection failed: {e}")
+async def fetch(session, endpoint):
+    async with session.get(f"{BASE_URL}{endpoint}") as response:
+        if response.status != 200:
+            return response.status, None
+        return response.status, await response.json()
+
+def report(endpoint, outcome, output_filename=None):
+    print(f"Testing {BASE_URL}{endpoint}...")
+    if isinstance(outcome, aiohttp.ClientConnectionError):
+        print(f"Connection failed: {outcome}")
         print("   (Make sure the Docker container is running with 'docker-compose up')")
         return False
-    except Exception as e:
-        print(f"An error occurred: {e}")
+    if isinstance(outcome, Exception):
+        print(f"An error occurred: {outcome}")
+        return False
+
+    status, data = outcome
+    if status != 200:
+        print(f"Failed with status code: {status}")
         return False
-    print("-" * 40)
 
-def main():
+    print(f"✅ Success! Response:")
+    print(json.dumps(data, indent=2)[:500] + "... (truncated)" if len(str(data)) > 500 else json.dumps(data, indent=2))
+
+    if output_filename:
+        with open(output_filename, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        print(f"💾 Saved response to '{output_filename}'")
+    return True
+
+async def main():
     print("--- n8n Workflow Popularity Tracker API Verification ---\n")
-    
-    # 1. Check Health
-    if not make_request("/health"):
-        sys.exit(1)
-        
-    print("\n" + "-" * 40 + "\n")
 
-    # 2. Check Workflows (Database Connection)
-    make_request("/api/v1/workflows", output_filename="api_workflows.json")
+    # 1. Health, 2. Workflows (Database Connection), 3. Analytics (Novelty Feature)
+    checks = [
+        ("/health", None),
+        ("/api/v1/workflows", "api_workflows.json"),
+        ("/api/v1/analytics/geographic-divergence", None),
+    ]
 
-    print("\n" + "-" * 40 + "\n")
+    # Issue all requests concurrently, then report in order
+    async with aiohttp.ClientSession() as session:
+        outcomes = await asyncio.gather(
+            *(fetch(session, endpoint) for endpoint, _ in checks),
+            return_exceptions=True
+        )
 
-    # 3. Check Analytics (Novelty Feature)
-    make_request("/api/v1/analytics/geographic-divergence")
+    for i, ((endpoint, output_filename), outcome) in enumerate(zip(checks, outcomes)):
+        if i:
+            print("\n" + "-" * 40 + "\n")
+        if not report(endpoint, outcome, output_filename) and endpoint == "/health":
+            sys.exit(1)
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())